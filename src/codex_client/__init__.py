@@ -1,5 +1,5 @@
 """Codex client package."""
 
-from .session import run_codex_turn, run_session
+from .session import CodexSession, run_codex_turn, run_session
 
-__all__ = ["run_codex_turn", "run_session"]
+__all__ = ["CodexSession", "run_codex_turn", "run_session"]
@@ -0,0 +1,6 @@
+"""Run a one-off turn: ``python -m codex_client "instruction"``."""
+
+from .cli import main
+
+if __name__ == "__main__":
+    raise SystemExit(main())
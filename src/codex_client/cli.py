@@ -0,0 +1,13 @@
+"""Command-line entry point shared by ``Main.py`` and ``python -m codex_client``."""
+
+from __future__ import annotations
+
+import sys
+
+from . import config
+from .session import run_session
+
+
+def main() -> int:
+    instruction = " ".join(sys.argv[1:]) or config.DEFAULT_INSTRUCTION
+    return run_session(instruction)
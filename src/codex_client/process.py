@@ -2,14 +2,27 @@
 
 from __future__ import annotations
 
+import io
 import os
 import shutil
 import subprocess
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl; the pipe keeps its default size.
+    fcntl = None
 
-def _build_process_env() -> Dict[str, str]:
-    env = dict(os.environ)
+STDOUT_READ_BUFFER_SIZE = 64 * 1024
+STDOUT_PIPE_CAPACITY = 1 << 20
+
+# Launch settings derived from os.environ, reused until the environment changes.
+_LAUNCH_ENV_SOURCE: Optional[Dict[str, str]] = None
+_LAUNCH_SETTINGS: Optional[Tuple[List[str], Dict[str, str]]] = None
+
+
+def _build_process_env(source: Dict[str, str]) -> Dict[str, str]:
+    env = dict(source)
     raw_path = env.get("PATH", "")
     expanded_entries = [
         os.path.expanduser(entry) if entry else entry
@@ -35,15 +48,54 @@ def _resolve_codex_command(env: Dict[str, str]) -> List[str]:
     return [codex_path, "app-server"]
 
 
-def start_codex_process() -> subprocess.Popen[str]:
-    env = _build_process_env()
-    return subprocess.Popen(
-        _resolve_codex_command(env),
+def _get_launch_settings() -> Tuple[List[str], Dict[str, str]]:
+    # Comparing a dict snapshot is much cheaper than re-expanding PATH and
+    # re-running shutil.which, which stats every PATH entry.
+    global _LAUNCH_ENV_SOURCE, _LAUNCH_SETTINGS
+    source = dict(os.environ)
+    if _LAUNCH_SETTINGS is None or source != _LAUNCH_ENV_SOURCE:
+        env = _build_process_env(source)
+        _LAUNCH_SETTINGS = (_resolve_codex_command(env), env)
+        _LAUNCH_ENV_SOURCE = source
+    return _LAUNCH_SETTINGS
+
+
+def _enlarge_pipe(fd: int) -> None:
+    # Linux only (F_SETPIPE_SZ). A larger kernel pipe lets Codex keep streaming
+    # while we are busy with a line. Windows anonymous pipes get their size at
+    # creation inside subprocess, so there only the user-space buffer grows.
+    set_pipe_size = getattr(fcntl, "F_SETPIPE_SZ", None)
+    if set_pipe_size is None:
+        return
+    try:
+        fcntl.fcntl(fd, set_pipe_size, STDOUT_PIPE_CAPACITY)
+    except OSError:
+        # Above /proc/sys/fs/pipe-max-size for unprivileged users; keep default.
+        return
+
+
+def start_codex_process() -> subprocess.Popen[bytes]:
+    # Pipes stay binary: the protocol is JSON lines, so the session splits on
+    # newlines itself and only decodes text when writing the log.
+    command, env = _get_launch_settings()
+    proc = subprocess.Popen(
+        command,
         stdin=subprocess.PIPE,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
-        text=True,
-        encoding="utf-8",
-        errors="replace",
+        bufsize=0,
         env=env,
+        # Inherit nothing beyond the three pipes (Python uses closefrom() for
+        # this where available), and give Codex its own session so terminal
+        # signals aimed at the bot are not delivered to it as well; sessions
+        # are terminated explicitly on close.
+        close_fds=True,
+        pass_fds=(),
+        start_new_session=True,
     )
+    # bufsize=0 hands back raw FileIO pipes; each reader gets exactly one buffer
+    # layer, and stdout's is sized so a burst of deltas needs few read syscalls.
+    proc.stdout = io.BufferedReader(proc.stdout, buffer_size=STDOUT_READ_BUFFER_SIZE)
+    proc.stderr = io.BufferedReader(proc.stderr)
+    _enlarge_pipe(proc.stdout.fileno())
+    return proc
@@ -2,10 +2,35 @@
 
 from __future__ import annotations
 
+import json
 from typing import Any, Dict, Optional
 
 from . import config
 
+try:
+    import orjson
+except ImportError:  # stdlib json covers environments installed without orjson.
+    orjson = None
+
+
+def _dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    """Serialize a message as one newline-terminated JSON line."""
+    payload = _dumps(message)
+    payload += b"\n"
+    return payload
+
+
+def decode_message(line: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
 
 def build_initialize_message() -> Dict[str, Any]:
     return {
@@ -25,36 +50,55 @@ def build_initialized_message() -> Dict[str, Any]:
     return {"method": "initialized", "params": {}}
 
 
-def build_thread_start_message(cwd: Optional[str] = None) -> Dict[str, Any]:
-    params: Dict[str, Any] = {}
-    if cwd:
-        params["cwd"] = cwd
-    return {"method": "thread/start", "id": 1, "params": params}
+# Per-turn messages are rendered from byte templates so only the string fields
+# go through the JSON encoder; the envelope never becomes a dict.
+_THREAD_START_TEMPLATE = b'{"method":"thread/start","id":%d,"params":{%b}}\n'
+_THREAD_RESUME_TEMPLATE = (
+    b'{"method":"thread/resume","id":%d,"params":{"threadId":%b%b}}\n'
+)
+_TURN_START_TEMPLATE = (
+    b'{"method":"turn/start","id":%d,"params":{"threadId":%b,'
+    b'"input":[{"type":"text","text":%b}]%b}}\n'
+)
+
 
+def _cwd_field(cwd: Optional[str], separator: bytes = b",") -> bytes:
+    if not cwd:
+        return b""
+    return separator + b'"cwd":' + _dumps(cwd)
 
-def build_thread_resume_message(
+
+def build_thread_start_bytes(request_id: int, cwd: Optional[str] = None) -> bytes:
+    return _THREAD_START_TEMPLATE % (request_id, _cwd_field(cwd, separator=b""))
+
+
+def build_thread_resume_bytes(
+    request_id: int,
     thread_id: str,
     cwd: Optional[str] = None,
-) -> Dict[str, Any]:
-    params: Dict[str, Any] = {"threadId": thread_id}
-    if cwd:
-        params["cwd"] = cwd
-    return {"method": "thread/resume", "id": 1, "params": params}
+) -> bytes:
+    return _THREAD_RESUME_TEMPLATE % (
+        request_id,
+        _dumps(thread_id),
+        _cwd_field(cwd),
+    )
 
 
-def build_turn_start_message(
+def build_turn_start_bytes(
+    request_id: int,
     thread_id: str,
     instruction: str,
     cwd: Optional[str] = None,
-) -> Dict[str, Any]:
-    params: Dict[str, Any] = {
-        "threadId": thread_id,
-        "input": [{"type": "text", "text": instruction}],
-    }
-    if cwd:
-        params["cwd"] = cwd
-    return {
-        "method": "turn/start",
-        "id": 2,
-        "params": params,
-    }
+) -> bytes:
+    return _TURN_START_TEMPLATE % (
+        request_id,
+        _dumps(thread_id),
+        _dumps(instruction),
+        _cwd_field(cwd),
+    )
+
+
+# The handshake depends only on config constants, so it is serialized once.
+# It always uses request id 0; later requests on the connection count up from 1.
+INITIALIZE_BYTES = encode_message(build_initialize_message())
+INITIALIZED_BYTES = encode_message(build_initialized_message())
@@ -2,84 +2,262 @@
 
 from __future__ import annotations
 
-import json
+import itertools
+import os
+import subprocess
+import queue
+import selectors
 import threading
 import time
-from datetime import datetime
+from collections import deque
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Callable, Dict, Optional, Tuple
+from typing import Callable, Dict, Iterator, Optional, Tuple
 
 from . import protocol
-from .process import start_codex_process
-
-
-def _send_message(proc, message: Dict[str, object]) -> None:
-    if proc.stdin is None:
-        raise RuntimeError("Process stdin is unavailable.")
-    proc.stdin.write(json.dumps(message) + "\n")
-    proc.stdin.flush()
-
-
-def _open_log_file() -> tuple[Path, "TextIO"]:
-    repo_root = Path(__file__).resolve().parents[2]
-    logs_dir = repo_root / "logs"
-    logs_dir.mkdir(parents=True, exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-    log_path = logs_dir / f"codex-{timestamp}.log"
-    log_file = log_path.open("a", encoding="utf-8", buffering=1)
-    return log_path, log_file
-
-
-def _write_log_line(
-    log_file: "TextIO",
-    lock: threading.Lock,
-    stream_label: str,
-    line: str,
-) -> None:
-    with lock:
-        log_file.write(f"{stream_label}: {line}\n")
-        log_file.flush()
-
-
-APPROVAL_METHODS = {
-    "item/commandExecution/requestApproval",
-    "item/fileChange/requestApproval",
-}
+from .process import STDOUT_READ_BUFFER_SIZE, start_codex_process
+
+
+def _write_all(fd: int, payload: bytes) -> None:
+    # One os.write per message replaces the buffered write + flush pair; loop
+    # only in the rare case the fd accepts a partial write.
+    remaining = memoryview(payload)
+    while remaining:
+        written = os.write(fd, remaining)
+        remaining = remaining[written:]
+
+
+def _send_message(stdin_fd: int, message: Dict[str, object]) -> None:
+    _write_all(stdin_fd, protocol.encode_message(message))
+
+
+# O_BINARY only exists on Windows, where it disables newline translation.
+_LOG_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+
+
+# How long close() waits after terminate() before falling back to kill().
+PROCESS_EXIT_TIMEOUT_SECONDS = 5.0
+
+_REPO_ROOT = Path(__file__).resolve().parents[2]
+_LOGS_DIR = _REPO_ROOT / "logs"
+_LOGS_DIR_READY = False
+# Second-resolution timestamps collide when the bot runs two turns within the
+# same second; the pid and a per-process counter keep every log name unique.
+_LOG_SEQUENCE = itertools.count()
+
+
+def _open_log_file() -> tuple[Path, int]:
+    global _LOGS_DIR_READY
+    if not _LOGS_DIR_READY:
+        _LOGS_DIR.mkdir(parents=True, exist_ok=True)
+        _LOGS_DIR_READY = True
+    timestamp = time.strftime("%Y%m%d-%H%M%S")
+    log_name = f"codex-{timestamp}-{os.getpid()}-{next(_LOG_SEQUENCE)}.log"
+    log_path = _LOGS_DIR / log_name
+    log_fd = os.open(log_path, _LOG_OPEN_FLAGS, 0o644)
+    return log_path, log_fd
+
+
+class _LogWriter:
+    """Writes log lines from a background thread so readers never block on disk.
+
+    Lines are queued without locking; the writer thread joins up to
+    ``BATCH_SIZE`` queued lines into one unbuffered ``os.write``, issued as
+    soon as the batch is full or the queue has been idle for
+    ``FLUSH_INTERVAL`` seconds.
+    """
+
+    BATCH_SIZE = 64
+    FLUSH_INTERVAL = 0.01
+    _STOP = object()
+
+    def __init__(self, log_fd: int) -> None:
+        self._log_fd = log_fd
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write_line(self, stream_label: bytes, line: bytes) -> None:
+        self._queue.put((stream_label, line))
+
+    def close(self) -> None:
+        self._queue.put(self._STOP)
+        self._thread.join()
+        os.close(self._log_fd)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect_batch()
+            if batch:
+                _write_all(self._log_fd, b"".join(batch))
+
+    def _collect_batch(self) -> tuple[list[bytes], bool]:
+        batch: list[bytes] = []
+        entry = self._queue.get()
+        while entry is not self._STOP:
+            stream_label, line = entry
+            batch.append(stream_label + b": " + line + b"\n")
+            if len(batch) >= self.BATCH_SIZE:
+                return batch, False
+            try:
+                entry = self._queue.get(timeout=self.FLUSH_INTERVAL)
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+
+APPROVAL_METHODS = frozenset(
+    {
+        "item/commandExecution/requestApproval",
+        "item/fileChange/requestApproval",
+    }
+)
 
 
 def _start_stderr_logger(
     proc,
-    log_file: "TextIO",
-    log_lock: threading.Lock,
+    log_writer: _LogWriter,
 ) -> Optional[threading.Thread]:
     if proc.stderr is None:
         return None
 
     def _drain_stderr() -> None:
-        for err_line in proc.stderr:
-            _write_log_line(log_file, log_lock, "stderr", err_line.rstrip("\n"))
+        try:
+            for err_line in proc.stderr:
+                log_writer.write_line(b"stderr", err_line.rstrip(b"\r\n"))
+        except (OSError, ValueError):
+            # CodexSession.close() closed the pipe under us.
+            return
 
     stderr_thread = threading.Thread(target=_drain_stderr, daemon=True)
     stderr_thread.start()
     return stderr_thread
 
 
-def _handle_approval_request(proc, msg: Dict[str, object]) -> bool:
-    method = msg.get("method")
-    if method not in APPROVAL_METHODS:
-        return False
+class _SelectorPipeReader:
+    """Reads stdout lines and logs stderr lines from a single thread.
+
+    Both pipes are multiplexed with ``selectors`` and drained with ``os.read``
+    on the raw fds. Buffered ``readline`` cannot be used here: data already
+    sitting in a Python buffer is invisible to ``select``, which would then
+    block with a complete line in hand.
+
+    Pipes are only read while a turn is running. An idle app-server that fills
+    the stderr pipe blocks until ``drain_stderr`` runs at the start of the next
+    turn; request payloads are far smaller than the stdin pipe, so sending the
+    next request cannot deadlock against that blocked writer.
+    """
+
+    READ_SIZE = STDOUT_READ_BUFFER_SIZE
+
+    def __init__(self, proc, log_writer: _LogWriter) -> None:
+        self._log_writer = log_writer
+        self._selector = selectors.DefaultSelector()
+        self._partial_lines: Dict[int, bytearray] = {}
+        self._stdout_lines: deque[bytes] = deque()
+        self._stdout_open = True
+        streams = ((proc.stdout, b"stdout"), (proc.stderr, b"stderr"))
+        for stream, stream_label in streams:
+            fd = stream.fileno()
+            self._partial_lines[fd] = bytearray()
+            self._selector.register(fd, selectors.EVENT_READ, stream_label)
+
+    def read_stdout_line(self) -> Optional[bytes]:
+        """Return the next stdout line without its line ending, or None at EOF."""
+        while not self._stdout_lines:
+            if not self._stdout_open:
+                return None
+            for key, _events in self._selector.select():
+                self._read_available(key.fd, key.data)
+        return self._stdout_lines.popleft()
+
+    def drain_stderr(self) -> None:
+        """Log stderr written between turns without waiting for more."""
+        while True:
+            ready = [
+                key for key, _events in self._selector.select(timeout=0)
+                if key.data == b"stderr"
+            ]
+            if not ready:
+                return
+            for key in ready:
+                self._read_available(key.fd, key.data)
+
+    def close(self) -> None:
+        self._selector.close()
+
+    def _read_available(self, fd: int, stream_label: bytes) -> None:
+        chunk = os.read(fd, self.READ_SIZE)
+        partial = self._partial_lines[fd]
+        if not chunk:
+            self._selector.unregister(fd)
+            if partial:
+                self._emit_line(stream_label, bytes(partial))
+                partial.clear()
+            if stream_label == b"stdout":
+                self._stdout_open = False
+            return
+        partial += chunk
+        last_newline = partial.rfind(b"\n")
+        if last_newline < 0:
+            return
+        complete = bytes(partial[:last_newline])
+        del partial[: last_newline + 1]
+        for line in complete.split(b"\n"):
+            self._emit_line(stream_label, line)
+
+    def _emit_line(self, stream_label: bytes, line: bytes) -> None:
+        line = line.rstrip(b"\r")
+        if stream_label == b"stdout":
+            self._stdout_lines.append(line)
+        else:
+            self._log_writer.write_line(stream_label, line)
+
+
+class _ThreadedPipeReader:
+    """Windows fallback: selectors cannot wait on pipes there, so stderr is
+    drained by a helper thread and stdout is read with a blocking readline.
+    """
+
+    def __init__(self, proc, log_writer: _LogWriter) -> None:
+        self._stdout = proc.stdout
+        self._stderr_thread = _start_stderr_logger(proc, log_writer)
+
+    def read_stdout_line(self) -> Optional[bytes]:
+        """Return the next stdout line without its line ending, or None at EOF."""
+        line = self._stdout.readline()
+        if not line:
+            return None
+        return line.rstrip(b"\r\n")
+
+    def drain_stderr(self) -> None:
+        # The helper thread keeps stderr drained at all times.
+        return
 
+    def close(self) -> None:
+        if self._stderr_thread is not None:
+            self._stderr_thread.join(timeout=1.0)
+
+
+def _open_pipe_reader(proc, log_writer: _LogWriter):
+    if os.name == "nt":
+        return _ThreadedPipeReader(proc, log_writer)
+    return _SelectorPipeReader(proc, log_writer)
+
+
+def _handle_approval_request(stdin_fd: int, msg: Dict[str, object]) -> bool:
+    # Only reached through _METHOD_HANDLERS, so the method is already known to
+    # be one of APPROVAL_METHODS.
     request_id = msg.get("id")
     if request_id is None:
         return False
 
-    _send_message(proc, {"id": request_id, "result": {"decision": "accept"}})
+    _send_message(stdin_fd, {"id": request_id, "result": {"decision": "accept"}})
     return True
 
 
 def _extract_agent_delta(msg: Dict[str, object]) -> Optional[str]:
-    if msg.get("method") != "item/agentMessage/delta":
-        return None
     params = msg.get("params", {})
     if not isinstance(params, dict):
         return None
@@ -89,9 +267,61 @@ def _extract_agent_delta(msg: Dict[str, object]) -> Optional[str]:
     return None
 
 
-def _extract_agent_completed_text(msg: Dict[str, object]) -> Optional[str]:
-    if msg.get("method") != "item/completed":
+# Deltas dominate a streaming turn, so their text is sliced straight out of the
+# raw line. Anything that does not match this exact compact shape falls back to
+# the full JSON decode.
+_AGENT_DELTA_PREFIX = b'{"method":"item/agentMessage/delta"'
+_PARAMS_OPEN = b'"params":{'
+_DELTA_FIELD = b'"delta":"'
+# Any of these between the params brace and the delta key means the key may
+# belong to a nested object (or lie outside params); quotes inside JSON strings
+# are always escaped, so an unescaped match is otherwise a params-level key.
+_NESTING_BYTES = (b"{", b"[", b"}")
+_BACKSLASH = ord("\\")
+
+
+def _find_string_end(line: bytes, start: int) -> int:
+    """Return the index of the closing quote of a JSON string body, or -1."""
+    quote_index = line.find(b'"', start)
+    while quote_index >= 0:
+        backslashes = 0
+        probe = quote_index - 1
+        while probe >= start and line[probe] == _BACKSLASH:
+            backslashes += 1
+            probe -= 1
+        if backslashes % 2 == 0:
+            return quote_index
+        quote_index = line.find(b'"', quote_index + 1)
+    return -1
+
+
+def _peek_agent_delta(line: bytes) -> Optional[bytes]:
+    if not line.startswith(_AGENT_DELTA_PREFIX):
+        return None
+    params_index = line.find(_PARAMS_OPEN, len(_AGENT_DELTA_PREFIX))
+    if params_index < 0:
         return None
+    params_start = params_index + len(_PARAMS_OPEN)
+    field_index = line.find(_DELTA_FIELD, params_start)
+    if field_index < 0:
+        return None
+    before_field = line[params_start:field_index]
+    if any(nesting in before_field for nesting in _NESTING_BYTES):
+        return None
+    start = field_index + len(_DELTA_FIELD)
+    end = _find_string_end(line, start)
+    if end <= start:
+        # Missing or empty delta: let the full decode apply the "text" fallback.
+        return None
+    raw_delta = line[start:end]
+    if b"\\" in raw_delta:
+        unescaped = protocol.decode_message(b'"' + raw_delta + b'"')
+        return unescaped.encode("utf-8", "replace")
+    # Unescaped JSON string bodies are already the UTF-8 bytes of the text.
+    return raw_delta
+
+
+def _extract_agent_completed_text(msg: Dict[str, object]) -> Optional[str]:
     params = msg.get("params", {})
     if not isinstance(params, dict):
         return None
@@ -127,26 +357,19 @@ def _status_for_command_execution(item: Dict[str, object]) -> str:
     return DEFAULT_COMMAND_STATUS
 
 
-def _status_for_item_started(item: Dict[str, object]) -> Optional[str]:
-    item_type = item.get("type")
-    if item_type == "commandExecution":
-        return _status_for_command_execution(item)
-    if item_type == "fileChange":
-        return _status_for_file_change(item)
-    if item_type == "webSearch":
-        return _status_for_web_search(item)
-    if item_type == "mcpToolCall":
-        return _status_for_mcp_tool_call(item)
-    if item_type == "collabToolCall":
-        return _status_for_collab_tool_call(item)
-    return None
+def _basename(path_value: str) -> str:
+    # Status text only needs the last path segment; plain string slicing skips
+    # PurePath parsing and also handles Windows separators reported by Codex.
+    trimmed = path_value.rstrip("/\\")
+    separator_index = max(trimmed.rfind("/"), trimmed.rfind("\\"))
+    return trimmed[separator_index + 1 :]
 
 
 def _best_name(item: Dict[str, object], keys: list[str]) -> Optional[str]:
     for key in keys:
         value = item.get(key)
         if isinstance(value, str) and value.strip():
-            return Path(value).name
+            return _basename(value)
     return None
 
 
@@ -169,7 +392,7 @@ def _status_for_file_change(item: Dict[str, object]) -> str:
             continue
         path_value = change.get("path")
         if isinstance(path_value, str) and path_value.strip():
-            names.append(Path(path_value).name)
+            names.append(_basename(path_value))
     formatted_names = _format_name_list(names)
     count = len(names) if names else len(changes)
     if formatted_names:
@@ -203,135 +426,363 @@ def _status_for_collab_tool_call(item: Dict[str, object]) -> str:
     return DELEGATING_STATUS
 
 
-def run_codex_turn(
-    instruction: str,
-    thread_id: Optional[str] = None,
-    cwd: Optional[str] = None,
-    progress_callback: Optional[Callable[[str], None]] = None,
-) -> Tuple[str, str, Path]:
-    proc = start_codex_process()
-    log_path, log_file = _open_log_file()
-    log_lock = threading.Lock()
+_ITEM_STATUS_HANDLERS: Dict[str, Callable[[Dict[str, object]], str]] = {
+    "commandExecution": _status_for_command_execution,
+    "fileChange": _status_for_file_change,
+    "webSearch": _status_for_web_search,
+    "mcpToolCall": _status_for_mcp_tool_call,
+    "collabToolCall": _status_for_collab_tool_call,
+}
 
-    if proc.stdin is None or proc.stdout is None:
-        _write_log_line(log_file, log_lock, "stderr", "Failed to start codex app-server.")
-        log_file.close()
-        raise RuntimeError("Failed to start codex app-server.")
 
-    stderr_thread = _start_stderr_logger(proc, log_file, log_lock)
-    reply_chunks: list[str] = []
-    final_text: Optional[str] = None
-    turn_started = False
-    current_thread_id = thread_id
-    last_status: Optional[str] = None
-    response_started = False
-    last_status_time = 0.0
-
-    def _set_status(new_status: Optional[str], min_interval: Optional[float] = None) -> None:
-        nonlocal last_status, last_status_time
-        if progress_callback is None or not new_status or new_status == last_status:
+def _status_for_item_started(item: Dict[str, object]) -> Optional[str]:
+    status_handler = _ITEM_STATUS_HANDLERS.get(item.get("type"))
+    if status_handler is None:
+        return None
+    return status_handler(item)
+
+
+class _ProgressReporter:
+    """Forwards status text to the progress callback, skipping repeats."""
+
+    def __init__(self, callback: Callable[[str], None]) -> None:
+        self._callback = callback
+        self._last_status: Optional[str] = None
+        self._last_status_time = 0.0
+        self.response_started = False
+
+    def update(
+        self,
+        new_status: Optional[str],
+        min_interval: Optional[float] = None,
+        allow_after_response: bool = False,
+    ) -> None:
+        if self.response_started and not allow_after_response:
+            return
+        self._set_status(new_status, min_interval)
+
+    def _set_status(
+        self,
+        new_status: Optional[str],
+        min_interval: Optional[float] = None,
+    ) -> None:
+        if not new_status or new_status == self._last_status:
             return
         if min_interval is not None:
             now = time.monotonic()
-            if now - last_status_time < min_interval:
+            if now - self._last_status_time < min_interval:
                 return
         try:
-            progress_callback(new_status)
+            self._callback(new_status)
         except Exception:
             return
-        last_status = new_status
-        last_status_time = time.monotonic()
+        self._last_status = new_status
+        self._last_status_time = time.monotonic()
 
-    def _update_status(
-        new_status: Optional[str],
-        min_interval: Optional[float] = None,
-        allow_after_response: bool = False,
-    ) -> None:
-        if response_started and not allow_after_response:
+
+_MessageHandler = Callable[["_TurnState", Dict[str, object]], None]
+
+
+def _build_progress_reporter(
+    progress_callback: Optional[Callable[[str], None]],
+) -> Optional[_ProgressReporter]:
+    if progress_callback is None:
+        return None
+    return _ProgressReporter(progress_callback)
+
+
+@dataclass
+class _TurnState:
+    stdin_fd: int
+    request_ids: Iterator[int]
+    instruction: str
+    cwd: Optional[str]
+    thread_id: Optional[str]
+    # None when the caller passed no callback; status work is skipped entirely.
+    progress: Optional[_ProgressReporter]
+    pending_responses: Dict[int, _MessageHandler] = field(default_factory=dict)
+    reply_buffer: bytearray = field(default_factory=bytearray)
+    final_text: Optional[str] = None
+    turn_started: bool = False
+    completed: bool = False
+
+    def mark_response_started(self) -> None:
+        if self.progress is not None:
+            self.progress.response_started = True
+
+    def reply_text(self) -> str:
+        if self.final_text is not None:
+            return self.final_text
+        return self.reply_buffer.decode("utf-8", "replace")
+
+
+def _send_request(
+    turn: _TurnState,
+    build_payload: Callable[[int], bytes],
+    on_response: _MessageHandler,
+) -> None:
+    request_id = next(turn.request_ids)
+    turn.pending_responses[request_id] = on_response
+    _write_all(turn.stdin_fd, build_payload(request_id))
+
+
+def _send_turn_start(turn: _TurnState) -> None:
+    _send_request(
+        turn,
+        lambda request_id: protocol.build_turn_start_bytes(
+            request_id,
+            turn.thread_id,
+            turn.instruction,
+            cwd=turn.cwd,
+        ),
+        _on_turn_response,
+    )
+    turn.turn_started = True
+
+
+def _on_approval_request(turn: _TurnState, msg: Dict[str, object]) -> None:
+    _handle_approval_request(turn.stdin_fd, msg)
+
+
+def _on_item_started(turn: _TurnState, msg: Dict[str, object]) -> None:
+    if turn.progress is None:
+        return
+    params = msg.get("params", {})
+    item = params.get("item", {}) if isinstance(params, dict) else {}
+    if isinstance(item, dict):
+        turn.progress.update(_status_for_item_started(item))
+
+
+def _record_agent_delta(turn: _TurnState, delta: bytes) -> None:
+    turn.mark_response_started()
+    turn.reply_buffer += delta
+
+
+def _on_agent_delta(turn: _TurnState, msg: Dict[str, object]) -> None:
+    delta = _extract_agent_delta(msg)
+    if delta:
+        _record_agent_delta(turn, delta.encode("utf-8", "replace"))
+
+
+def _on_item_completed(turn: _TurnState, msg: Dict[str, object]) -> None:
+    completed_text = _extract_agent_completed_text(msg)
+    if not completed_text:
+        return
+    turn.mark_response_started()
+    turn.final_text = completed_text
+
+
+def _on_turn_completed(turn: _TurnState, msg: Dict[str, object]) -> None:
+    turn.completed = True
+
+
+def _on_thread_response(turn: _TurnState, msg: Dict[str, object]) -> None:
+    error = msg.get("error")
+    if error:
+        raise RuntimeError(f"Thread start/resume failed: {error}")
+    result = msg.get("result", {})
+    if isinstance(result, dict):
+        thread = result.get("thread", {})
+        if isinstance(thread, dict):
+            turn.thread_id = thread.get("id") or turn.thread_id
+    if turn.thread_id and not turn.turn_started:
+        _send_turn_start(turn)
+
+
+def _on_turn_response(turn: _TurnState, msg: Dict[str, object]) -> None:
+    error = msg.get("error")
+    if error:
+        raise RuntimeError(f"Turn start failed: {error}")
+
+
+# Notifications and server requests are dispatched on "method"; replies to our
+# own requests carry no method and are matched to the request id that sent them.
+_METHOD_HANDLERS: Dict[str, _MessageHandler] = {
+    "item/agentMessage/delta": _on_agent_delta,
+    "item/completed": _on_item_completed,
+    "item/started": _on_item_started,
+    "turn/completed": _on_turn_completed,
+    **dict.fromkeys(APPROVAL_METHODS, _on_approval_request),
+}
+
+
+def _dispatch_message(turn: _TurnState, msg: Dict[str, object]) -> None:
+    method = msg.get("method")
+    if method is None:
+        handler = turn.pending_responses.pop(msg.get("id"), None)
+    else:
+        handler = _METHOD_HANDLERS.get(method)
+    if handler is not None:
+        handler(turn, msg)
+
+
+class CodexSession:
+    """A Codex app-server process that is kept alive across turns.
+
+    The process, its pipes, and the session log are set up on the first turn
+    and reused until ``close()``, so later turns skip the spawn and the
+    handshake. Threads already opened by this process are not resumed again.
+    A failed turn closes the session; the next turn starts a fresh process.
+    Turns must not run concurrently on the same session.
+    """
+
+    def __init__(self) -> None:
+        self._proc = None
+        self._stdin_fd = -1
+        self._pipe_reader = None
+        self._log_writer: Optional[_LogWriter] = None
+        self._log_path: Optional[Path] = None
+        self._request_ids = itertools.count(1)
+        self._loaded_thread_ids: set[str] = set()
+
+    def __enter__(self) -> CodexSession:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def run_turn(
+        self,
+        instruction: str,
+        thread_id: Optional[str] = None,
+        cwd: Optional[str] = None,
+        progress_callback: Optional[Callable[[str], None]] = None,
+    ) -> Tuple[str, str, Path]:
+        try:
+            if not self._is_running():
+                self._start()
+            turn = _TurnState(
+                stdin_fd=self._stdin_fd,
+                request_ids=self._request_ids,
+                instruction=instruction,
+                cwd=cwd,
+                thread_id=thread_id,
+                progress=_build_progress_reporter(progress_callback),
+            )
+            log_path = self._log_path
+            self._pipe_reader.drain_stderr()
+            self._begin_turn(turn)
+            self._read_until_turn_completed(turn)
+        except BaseException:
+            self.close()
+            raise
+
+        if not turn.completed:
+            # stdout closed mid-turn: the process is gone, so respawn next time
+            # and resume the thread there rather than treating it as loaded.
+            self.close()
+        elif turn.thread_id:
+            self._loaded_thread_ids.add(turn.thread_id)
+        if not turn.thread_id:
+            raise RuntimeError("Codex did not return a thread id.")
+        return turn.reply_text(), turn.thread_id, log_path
+
+    def close(self) -> None:
+        if self._proc is None:
             return
-        _set_status(new_status, min_interval)
+        self._stop_process()
+        for pipe in (self._proc.stdin, self._proc.stdout, self._proc.stderr):
+            if pipe is not None:
+                pipe.close()
+        self._pipe_reader.close()
+        self._log_writer.close()
+        self._proc = None
+        self._stdin_fd = -1
+        self._pipe_reader = None
+        self._log_writer = None
+        self._loaded_thread_ids.clear()
+
+    def _stop_process(self) -> None:
+        # Reaped here so a closed session never leaves a zombie behind.
+        self._proc.terminate()
+        try:
+            self._proc.wait(timeout=PROCESS_EXIT_TIMEOUT_SECONDS)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+            self._proc.wait()
+
+    def _is_running(self) -> bool:
+        if self._proc is None:
+            return False
+        if self._proc.poll() is None:
+            return True
+        self.close()
+        return False
 
-    try:
-        _send_message(proc, protocol.build_initialize_message())
-        _send_message(proc, protocol.build_initialized_message())
-        if current_thread_id:
-            _send_message(
-                proc,
-                protocol.build_thread_resume_message(current_thread_id, cwd=cwd),
+    def _start(self) -> None:
+        proc = start_codex_process()
+        log_path, log_fd = _open_log_file()
+        log_writer = _LogWriter(log_fd)
+
+        if proc.stdin is None or proc.stdout is None:
+            log_writer.write_line(b"stderr", b"Failed to start codex app-server.")
+            log_writer.close()
+            proc.terminate()
+            raise RuntimeError("Failed to start codex app-server.")
+
+        self._proc = proc
+        self._stdin_fd = proc.stdin.fileno()
+        self._pipe_reader = _open_pipe_reader(proc, log_writer)
+        self._log_writer = log_writer
+        self._log_path = log_path
+        self._request_ids = itertools.count(1)
+        _write_all(self._stdin_fd, protocol.INITIALIZE_BYTES)
+        _write_all(self._stdin_fd, protocol.INITIALIZED_BYTES)
+
+    def _begin_turn(self, turn: _TurnState) -> None:
+        thread_id = turn.thread_id
+        if thread_id in self._loaded_thread_ids:
+            _send_turn_start(turn)
+        elif thread_id:
+            _send_request(
+                turn,
+                lambda request_id: protocol.build_thread_resume_bytes(
+                    request_id,
+                    thread_id,
+                    cwd=turn.cwd,
+                ),
+                _on_thread_response,
             )
         else:
-            _send_message(proc, protocol.build_thread_start_message(cwd=cwd))
+            _send_request(
+                turn,
+                lambda request_id: protocol.build_thread_start_bytes(
+                    request_id,
+                    cwd=turn.cwd,
+                ),
+                _on_thread_response,
+            )
 
-        for line in proc.stdout:
-            line = line.strip()
+    def _read_until_turn_completed(self, turn: _TurnState) -> None:
+        while not turn.completed:
+            line = self._pipe_reader.read_stdout_line()
+            if line is None:
+                return
+            # Readers already trim the line ending, and JSON lines carry no
+            # leading whitespace, so no strip() is needed before the checks.
             if not line:
                 continue
 
-            _write_log_line(log_file, log_lock, "stdout", line)
-            msg = json.loads(line)
-
-            if isinstance(msg, dict) and _handle_approval_request(proc, msg):
+            self._log_writer.write_line(b"stdout", line)
+            delta = _peek_agent_delta(line)
+            if delta is not None:
+                _record_agent_delta(turn, delta)
                 continue
 
-            if isinstance(msg, dict) and msg.get("id") == 1:
-                error = msg.get("error")
-                if error:
-                    raise RuntimeError(f"Thread start/resume failed: {error}")
-                result = msg.get("result", {})
-                if isinstance(result, dict):
-                    thread = result.get("thread", {})
-                    if isinstance(thread, dict):
-                        current_thread_id = thread.get("id") or current_thread_id
-                if current_thread_id and not turn_started:
-                    _send_message(
-                        proc,
-                        protocol.build_turn_start_message(
-                            current_thread_id,
-                            instruction,
-                            cwd=cwd,
-                        ),
-                    )
-                    turn_started = True
-                continue
+            msg = protocol.decode_message(line)
+            if isinstance(msg, dict):
+                _dispatch_message(turn, msg)
 
-            if isinstance(msg, dict) and msg.get("id") == 2 and msg.get("error"):
-                raise RuntimeError(f"Turn start failed: {msg.get('error')}")
 
-            if isinstance(msg, dict):
-                method = msg.get("method")
-                if method == "item/started":
-                    params = msg.get("params", {})
-                    item = params.get("item", {}) if isinstance(params, dict) else {}
-                    if isinstance(item, dict):
-                        _update_status(_status_for_item_started(item))
-
-                delta = _extract_agent_delta(msg)
-                if delta:
-                    if not response_started:
-                        response_started = True
-                    reply_chunks.append(delta)
-                    continue
-
-                completed_text = _extract_agent_completed_text(msg)
-                if completed_text:
-                    if not response_started:
-                        response_started = True
-                    final_text = completed_text
-                    continue
-
-                if msg.get("method") == "turn/completed":
-                    break
-    finally:
-        proc.terminate()
-        if stderr_thread is not None:
-            stderr_thread.join(timeout=1.0)
-        log_file.close()
-
-    if not current_thread_id:
-        raise RuntimeError("Codex did not return a thread id.")
-
-    reply_text = final_text if final_text is not None else "".join(reply_chunks)
-    return reply_text, current_thread_id, log_path
+def run_codex_turn(
+    instruction: str,
+    thread_id: Optional[str] = None,
+    cwd: Optional[str] = None,
+    progress_callback: Optional[Callable[[str], None]] = None,
+) -> Tuple[str, str, Path]:
+    """Run a single turn on a throwaway session (one process per call)."""
+    with CodexSession() as session:
+        return session.run_turn(instruction, thread_id, cwd, progress_callback)
 
 
 def run_session(instruction: str) -> int:
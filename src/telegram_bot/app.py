@@ -1,12 +1,43 @@
 from __future__ import annotations
 
-from telegram.ext import Application, CommandHandler, MessageHandler, filters
+import asyncio
+
+from telegram.ext import (
+    AIORateLimiter,
+    Application,
+    CommandHandler,
+    MessageHandler,
+    filters,
+)
 
 from . import handlers, project_store, state, utils
 
 
+async def _post_init(application: Application) -> None:
+    state.set_loop(asyncio.get_running_loop())
+    await project_store.start_background_saves()
+
+
+async def _post_shutdown(application: Application) -> None:
+    state.close_codex_sessions()
+    await project_store.stop_background_saves()
+
+
+def _build_rate_limiter() -> AIORateLimiter:
+    # Paces status edits and reply chunks under Telegram's flood limits and
+    # retries RetryAfter responses instead of surfacing them to handlers.
+    return AIORateLimiter(overall_max_rate=30, overall_time_period=1, max_retries=3)
+
+
 def build_application(token: str) -> Application:
-    application = Application.builder().token(token).build()
+    application = (
+        Application.builder()
+        .token(token)
+        .rate_limiter(_build_rate_limiter())
+        .post_init(_post_init)
+        .post_shutdown(_post_shutdown)
+        .build()
+    )
     application.add_handler(CommandHandler("start", handlers.start_command))
     application.add_handler(CommandHandler("help", handlers.help_command))
     application.add_handler(CommandHandler("reset", handlers.reset_command))
@@ -1,32 +1,37 @@
 from __future__ import annotations
 
 import asyncio
+import queue
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 
-from telegram import Update
+from telegram import Message, Update
 from telegram.constants import ChatAction
 from telegram.error import BadRequest
 from telegram.ext import ContextTypes
 
-from codex_client.session import run_codex_turn
-
 from . import project_store, state, utils
 
+_COMMANDS_TEXT = (
+    "Commands:\n"
+    "/start - Intro\n"
+    "/help - This help\n"
+    "/reset - Reset conversation context\n"
+    "/project - Manage project selection"
+)
+_START_TEXT = (
+    "Codex bot is ready. Send me instructions and I'll reply with the result.\n\n"
+    + _COMMANDS_TEXT
+)
+_HELP_TEXT = _COMMANDS_TEXT + "\n\nSend any instruction as a normal message."
+
 
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if await utils.reject_if_unauthorized(update):
         return
     if update.message is None:
         return
-    await update.message.reply_text(
-        "Codex bot is ready. Send me instructions and I'll reply with the result.\n\n"
-        "Commands:\n"
-        "/start - Intro\n"
-        "/help - This help\n"
-        "/reset - Reset conversation context\n"
-        "/project - Manage project selection",
-    )
+    await update.message.reply_text(_START_TEXT)
 
 
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -34,14 +39,7 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         return
     if update.message is None:
         return
-    await update.message.reply_text(
-        "Commands:\n"
-        "/start - Intro\n"
-        "/help - This help\n"
-        "/reset - Reset conversation context\n"
-        "/project - Manage project selection\n\n"
-        "Send any instruction as a normal message.",
-    )
+    await update.message.reply_text(_HELP_TEXT)
 
 
 async def reset_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -73,12 +71,16 @@ async def project_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         await _handle_project_default(update, chat_id)
         return
 
-    subcommand = args[0].lower()
-    handler = _PROJECT_SUBCOMMANDS.get(subcommand)
+    key = tuple(arg.lower() for arg in args[:2])
+    handler = _PROJECT_DISPATCH.get(key)
+    if handler is not None:
+        await handler(update, chat_id, args[2:])
+        return
+    handler = _PROJECT_DISPATCH.get(key[:1])
     if handler is None:
         await _reply_text(
             update,
-            f"Unknown /project subcommand: {subcommand}\n"
+            f"Unknown /project subcommand: {key[0]}\n"
             "Try /project, /project list, or /project root list.",
         )
         return
@@ -103,42 +105,33 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
     async with lock:
         await context.bot.send_chat_action(chat_id=chat_id, action=ChatAction.TYPING)
         current_project = project_store.get_current_project(chat_id)
-        if current_project and not Path(current_project).is_dir():
+        if current_project and not project_store.is_project_live(current_project):
             await update.message.reply_text(
                 "Current project path is missing. Use /project rescan or "
                 "/project use <name_or_index>.",
             )
             return
         status_message = await update.message.reply_text("Starting...")
-        loop = asyncio.get_running_loop()
-
-        async def _update_status(text: str) -> None:
-            try:
-                await status_message.edit_text(text)
-            except BadRequest as exc:
-                if "Message is not modified" in str(exc):
-                    return
-            except Exception:
-                return
-
-        def progress_callback(text: str) -> None:
-            asyncio.run_coroutine_threadsafe(_update_status(text), loop)
-
         thread_id = project_store.get_thread_id(chat_id, current_project)
         try:
-            response_text, new_thread_id, _log_path = await asyncio.to_thread(
-                run_codex_turn,
+            response_text, new_thread_id = await _run_codex_turn(
+                chat_id,
                 instruction,
                 thread_id,
                 current_project,
-                progress_callback,
+                status_message,
             )
         except Exception as exc:
-            await _update_status(f"Error: {exc}")
+            await _edit_status(status_message, f"Error: {exc}")
             await update.message.reply_text(f"Error: {exc}")
             return
 
-        project_store.set_thread_id(chat_id, new_thread_id, current_project)
+        await asyncio.to_thread(
+            project_store.set_thread_id,
+            chat_id,
+            new_thread_id,
+            current_project,
+        )
         response_text = response_text.strip() if response_text else ""
         if not response_text:
             response_text = "No response produced."
@@ -147,6 +140,96 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
             await update.message.reply_text(chunk)
 
 
+async def _run_codex_turn(
+    chat_id: int,
+    instruction: str,
+    thread_id: Optional[str],
+    current_project: Optional[str],
+    status_message: Message,
+) -> Tuple[str, str]:
+    loop = state.get_loop()
+    status_editor = _StatusEditor(status_message, loop)
+    codex_session = state.get_codex_session(chat_id)
+    try:
+        response_text, new_thread_id, _log_path = await loop.run_in_executor(
+            state.get_codex_executor(chat_id),
+            codex_session.run_turn,
+            instruction,
+            thread_id,
+            current_project,
+            status_editor.submit_threadsafe,
+        )
+    finally:
+        # Also on cancellation: close() releases the pool thread the editor
+        # keeps blocked in SimpleQueue.get().
+        await status_editor.close()
+    return response_text, new_thread_id
+
+
+STATUS_EDIT_INTERVAL_SECONDS = 1.0
+
+
+async def _edit_status(status_message: Message, text: str) -> bool:
+    try:
+        await status_message.edit_text(text)
+    except BadRequest as exc:
+        if "Message is not modified" in str(exc):
+            return False
+    except Exception:
+        return False
+    return True
+
+
+class _StatusEditor:
+    """Mirrors Codex progress into the status message without flooding Telegram.
+
+    Progress arrives from the Codex worker thread far faster than edits are
+    worth sending. The worker only puts text on a SimpleQueue, which never
+    touches the event loop; the consumer drains it to the latest text and
+    applies that at most once per ``STATUS_EDIT_INTERVAL_SECONDS``.
+    """
+
+    _CLOSED = object()
+
+    def __init__(self, status_message: Message, loop: asyncio.AbstractEventLoop) -> None:
+        self._status_message = status_message
+        self._loop = loop
+        self._pending: queue.SimpleQueue[object] = queue.SimpleQueue()
+        self._task = loop.create_task(self._apply_updates())
+
+    def submit_threadsafe(self, text: str) -> None:
+        self._pending.put(text)
+
+    async def close(self) -> None:
+        # The sentinel releases the executor thread blocked in get(), even
+        # though the task itself is cancelled without waiting for it.
+        self._pending.put(self._CLOSED)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    def _latest(self, item: object) -> object:
+        while True:
+            try:
+                newer = self._pending.get_nowait()
+            except queue.Empty:
+                return item
+            if newer is self._CLOSED:
+                return newer
+            item = newer
+
+    async def _apply_updates(self) -> None:
+        while True:
+            item = await self._loop.run_in_executor(None, self._pending.get)
+            text = self._latest(item)
+            if text is self._CLOSED:
+                return
+            if await _edit_status(self._status_message, text):
+                await asyncio.sleep(STATUS_EDIT_INTERVAL_SECONDS)
+
+
 def _format_project_label(project_path: Optional[str]) -> Optional[str]:
     if not project_path:
         return None
@@ -231,26 +314,26 @@ async def _handle_project_current(
 
 
 async def _handle_project_rescan(update: Update, chat_id: int, args: List[str]) -> None:
-    count = project_store.rescan_projects()
+    count = await asyncio.to_thread(project_store.rescan_projects)
     await _reply_text(update, f"Rescan complete. Found {count} project(s).")
 
 
-async def _handle_project_root(update: Update, chat_id: int, args: List[str]) -> None:
-    if not args:
-        await _reply_text(
-            update,
-            "Usage:\n"
-            "/project root list\n"
-            "/project root add <path>\n"
-            "/project root remove <path_or_index>",
-        )
-        return
-    subcommand = args[0].lower()
-    handler = _ROOT_SUBCOMMANDS.get(subcommand)
-    if handler is None:
-        await _reply_text(update, f"Unknown /project root subcommand: {subcommand}")
+async def _handle_project_root_usage(
+    update: Update,
+    chat_id: int,
+    args: List[str],
+) -> None:
+    # Reached only when no ("root", <subcommand>) entry matched.
+    if args:
+        await _reply_text(update, f"Unknown /project root subcommand: {args[0].lower()}")
         return
-    await handler(update, chat_id, args[1:])
+    await _reply_text(
+        update,
+        "Usage:\n"
+        "/project root list\n"
+        "/project root add <path>\n"
+        "/project root remove <path_or_index>",
+    )
 
 
 async def _handle_project_root_list(
@@ -279,7 +362,7 @@ async def _handle_project_root_add(
         return
     raw_path = " ".join(args).strip()
     try:
-        added, normalized = project_store.add_root(raw_path)
+        added, normalized = await asyncio.to_thread(project_store.add_root, raw_path)
     except ValueError as exc:
         await _reply_text(update, str(exc))
         return
@@ -316,7 +399,7 @@ async def _handle_project_root_remove(
             "Root not found. Use /project root list to see available roots.",
         )
         return
-    removed = project_store.remove_root(target)
+    removed = await asyncio.to_thread(project_store.remove_root, target)
     if removed:
         count = len(project_store.list_projects())
         await _reply_text(
@@ -337,8 +420,7 @@ def _resolve_project_selection(
             return None, f"Index out of range. Choose 1-{len(projects)}."
         return projects[index - 1], None
 
-    normalized = selection.lower()
-    matches = [project for project in projects if project.name.lower() == normalized]
+    matches = project_store.find_by_name(selection)
     if not matches:
         return None, f"No project named '{selection}'. Use /project list."
     if len(matches) > 1:
@@ -365,16 +447,17 @@ def _resolve_root_selection(selection: str, roots: List[str]) -> Optional[str]:
     return None
 
 
-_PROJECT_SUBCOMMANDS = {
-    "list": _handle_project_list,
-    "use": _handle_project_use,
-    "current": _handle_project_current,
-    "rescan": _handle_project_rescan,
-    "root": _handle_project_root,
-}
+_ProjectHandler = Callable[[Update, int, List[str]], Awaitable[None]]
 
-_ROOT_SUBCOMMANDS = {
-    "list": _handle_project_root_list,
-    "add": _handle_project_root_add,
-    "remove": _handle_project_root_remove,
+# Keyed by the lowercased leading arguments. project_command tries the
+# two-word key first and falls back to the one-word key.
+_PROJECT_DISPATCH: Dict[Tuple[str, ...], _ProjectHandler] = {
+    ("list",): _handle_project_list,
+    ("use",): _handle_project_use,
+    ("current",): _handle_project_current,
+    ("rescan",): _handle_project_rescan,
+    ("root",): _handle_project_root_usage,
+    ("root", "list"): _handle_project_root_list,
+    ("root", "add"): _handle_project_root_add,
+    ("root", "remove"): _handle_project_root_remove,
 }
@@ -1,10 +1,25 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import json
+import logging
 import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # stdlib json covers environments installed without orjson.
+    orjson = None
+
+logger = logging.getLogger(__name__)
 
 DATA_VERSION = 1
 IGNORED_DIR_NAMES = {
@@ -18,6 +33,8 @@ IGNORED_DIR_NAMES = {
     "dist",
     "node_modules",
 }
+MAX_SCAN_WORKERS = 8
+PROJECT_LIVE_TTL_SECONDS = 30.0
 
 
 @dataclass(frozen=True)
@@ -35,26 +52,114 @@ class ChatProjectState:
 
 _ROOTS: List[str] = []
 _PROJECTS: Dict[str, ProjectInfo] = {}
+# Rebuilt with _PROJECTS; matches are ordered by path, as in list_projects().
+_PROJECTS_BY_LOWER_NAME: Dict[str, List[ProjectInfo]] = {}
 _CHAT_STATE: Dict[int, ChatProjectState] = {}
+_PROJECT_LIVE_CACHE: Dict[str, float] = {}
+
+# Mutations take _STATE_LOCK so the writer thread always snapshots a consistent
+# state. _WRITE_LOCK serializes snapshot writers so an older snapshot can never
+# replace a newer one on disk.
+_STATE_LOCK = threading.Lock()
+_WRITE_LOCK = threading.Lock()
+
+# Saves are coalesced: mutators only flag the state dirty, and a background
+# task writes one snapshot per debounce window off the event loop thread.
+SAVE_DEBOUNCE_SECONDS = 0.25
+_SAVE_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_SAVE_REQUESTED: Optional[asyncio.Event] = None
+_SAVE_TASK: Optional[asyncio.Task] = None
+
+# Thread ids change on every Codex turn, so set_thread_id appends a record to
+# projects.log instead of rewriting the snapshot. Snapshots store the last
+# sequence number they include and replay applies only newer records. The log
+# is folded into the snapshot and removed on startup and after a rescan.
+# Sequence numbers are assigned under _STATE_LOCK together with the change
+# they record; _LOG_LOCK only guards the file, so the fsync never blocks
+# readers on the event loop. Lock order: _WRITE_LOCK, _STATE_LOCK, _LOG_LOCK.
+_LOG_LOCK = threading.Lock()
+_LOG_SEQ = 0
+_LOG_FILE: Optional[BinaryIO] = None
 
 
 def initialize() -> None:
-    roots, projects, chat_state = _load_from_disk()
+    global _LOG_SEQ
+    roots, projects, chat_state, log_seq = _load_from_disk()
+    log_seq = _replay_log(chat_state, log_seq)
     _set_state(roots, projects, chat_state)
+    _prune_chat_state()
+    _LOG_SEQ = log_seq
+    if _log_path().exists():
+        _compact_log()
+
+
+async def start_background_saves() -> None:
+    """Start coalescing saves on the running loop; call from the bot's post_init."""
+    global _SAVE_LOOP, _SAVE_REQUESTED, _SAVE_TASK
+    if _SAVE_TASK is not None:
+        return
+    _SAVE_LOOP = asyncio.get_running_loop()
+    _SAVE_REQUESTED = asyncio.Event()
+    _SAVE_TASK = asyncio.create_task(_run_background_saves(_SAVE_REQUESTED))
+
+
+async def stop_background_saves() -> None:
+    """Stop the background writer and flush any save that is still pending."""
+    global _SAVE_LOOP, _SAVE_REQUESTED, _SAVE_TASK
+    if _SAVE_TASK is None:
+        return
+    _SAVE_TASK.cancel()
+    try:
+        await _SAVE_TASK
+    except asyncio.CancelledError:
+        pass
+    save_pending = _SAVE_REQUESTED.is_set()
+    _SAVE_LOOP = None
+    _SAVE_REQUESTED = None
+    _SAVE_TASK = None
+    if save_pending:
+        await asyncio.to_thread(_write_snapshot)
 
 
 def list_roots() -> List[str]:
-    return list(_ROOTS)
+    with _STATE_LOCK:
+        return list(_ROOTS)
 
 
 def list_projects() -> List[ProjectInfo]:
-    return sorted(_PROJECTS.values(), key=lambda info: (info.name.lower(), info.path))
+    # Rescans run in a worker thread; copy under the lock so iteration never
+    # races with _PROJECTS being replaced.
+    with _STATE_LOCK:
+        projects = list(_PROJECTS.values())
+    return sorted(projects, key=lambda info: (info.name.lower(), info.path))
 
 
 def get_project_info(path: str) -> Optional[ProjectInfo]:
     return _PROJECTS.get(path)
 
 
+def find_by_name(name: str) -> List[ProjectInfo]:
+    """Return projects whose name matches ``name`` case-insensitively."""
+    return list(_PROJECTS_BY_LOWER_NAME.get(name.lower(), ()))
+
+
+def is_project_live(path: str) -> bool:
+    """Return whether ``path`` is a directory, re-checking at most every 30s.
+
+    Only positive results are cached, so a restored directory is usable on the
+    very next message.
+    """
+    now = time.monotonic()
+    checked_at = _PROJECT_LIVE_CACHE.get(path)
+    if checked_at is not None and now - checked_at < PROJECT_LIVE_TTL_SECONDS:
+        return True
+    if not os.path.isdir(path):
+        _PROJECT_LIVE_CACHE.pop(path, None)
+        return False
+    _PROJECT_LIVE_CACHE[path] = now
+    return True
+
+
 def get_current_project(chat_id: int) -> Optional[str]:
     chat_state = _CHAT_STATE.get(chat_id)
     if chat_state is None:
@@ -63,9 +168,10 @@ def get_current_project(chat_id: int) -> Optional[str]:
 
 
 def set_current_project(chat_id: int, project_path: Optional[str]) -> None:
-    chat_state = _CHAT_STATE.setdefault(chat_id, ChatProjectState())
-    chat_state.current_project = project_path
-    _save_to_disk()
+    with _STATE_LOCK:
+        chat_state = _CHAT_STATE.setdefault(chat_id, ChatProjectState())
+        chat_state.current_project = project_path
+    _request_save()
 
 
 def get_thread_id(chat_id: int, project_path: Optional[str]) -> Optional[str]:
@@ -78,12 +184,41 @@ def get_thread_id(chat_id: int, project_path: Optional[str]) -> Optional[str]:
 
 
 def set_thread_id(chat_id: int, thread_id: str, project_path: Optional[str]) -> None:
-    chat_state = _CHAT_STATE.setdefault(chat_id, ChatProjectState())
+    """Record a thread id durably; blocks on fsync, so call it off the event loop."""
+    global _LOG_SEQ
+    with _STATE_LOCK:
+        # Resumed threads report the id they were started with.
+        if get_thread_id(chat_id, project_path) == thread_id:
+            return
+        _apply_thread_id(_CHAT_STATE, chat_id, thread_id, project_path)
+        _LOG_SEQ += 1
+        record = {
+            "seq": _LOG_SEQ,
+            "op": "thread",
+            "chat": chat_id,
+            "project": project_path,
+            "id": thread_id,
+        }
+    try:
+        _append_log_record(record)
+    except OSError:
+        # A snapshot written after the change covers its sequence number, so
+        # replay will not apply a partial record on top of it.
+        logger.exception("Failed to append to project log; saving a snapshot instead.")
+        _request_save()
+
+
+def _apply_thread_id(
+    chat_states: Dict[int, ChatProjectState],
+    chat_id: int,
+    thread_id: str,
+    project_path: Optional[str],
+) -> None:
+    chat_state = chat_states.setdefault(chat_id, ChatProjectState())
     if project_path:
         chat_state.threads_by_project[project_path] = thread_id
     else:
         chat_state.default_thread_id = thread_id
-    _save_to_disk()
 
 
 def reset_thread_id(
@@ -94,14 +229,15 @@ def reset_thread_id(
     chat_state = _CHAT_STATE.get(chat_id)
     if chat_state is None:
         return
-    if reset_all:
-        chat_state.default_thread_id = None
-        chat_state.threads_by_project.clear()
-    elif project_path:
-        chat_state.threads_by_project.pop(project_path, None)
-    else:
-        chat_state.default_thread_id = None
-    _save_to_disk()
+    with _STATE_LOCK:
+        if reset_all:
+            chat_state.default_thread_id = None
+            chat_state.threads_by_project.clear()
+        elif project_path:
+            chat_state.threads_by_project.pop(project_path, None)
+        else:
+            chat_state.default_thread_id = None
+    _request_save()
 
 
 def add_root(raw_path: str) -> Tuple[bool, str]:
@@ -109,30 +245,44 @@ def add_root(raw_path: str) -> Tuple[bool, str]:
     root_path = Path(normalized)
     if not root_path.is_dir():
         raise ValueError(f"Root does not exist or is not a directory: {raw_path}")
-    if normalized in _ROOTS:
-        return False, normalized
-    _ROOTS.append(normalized)
-    _ROOTS.sort()
+    with _STATE_LOCK:
+        if normalized in _ROOTS:
+            return False, normalized
+        _ROOTS.append(normalized)
+        _ROOTS.sort()
+    # The rescan skips its save when no projects changed; the roots did.
+    _request_save()
     rescan_projects()
     return True, normalized
 
 
 def remove_root(raw_path: str) -> bool:
     normalized = _normalize_path(raw_path)
-    if normalized not in _ROOTS:
-        return False
-    _ROOTS[:] = [root for root in _ROOTS if root != normalized]
+    with _STATE_LOCK:
+        if normalized not in _ROOTS:
+            return False
+        _ROOTS[:] = [root for root in _ROOTS if root != normalized]
+    _request_save()
     rescan_projects()
     return True
 
 
 def rescan_projects() -> int:
-    projects = _scan_projects(_ROOTS)
-    _PROJECTS.clear()
-    _PROJECTS.update({info.path: info for info in projects})
-    _prune_chat_state()
-    _save_to_disk()
-    return len(_PROJECTS)
+    _normalize_path.cache_clear()
+    _PROJECT_LIVE_CACHE.clear()
+    projects = _scan_projects(list_roots())
+    new_paths = frozenset(info.path for info in projects)
+    with _STATE_LOCK:
+        # Names derive from paths, and chat state is pruned on load, so an
+        # unchanged path set leaves nothing to prune or save.
+        projects_changed = new_paths != frozenset(_PROJECTS)
+        if projects_changed:
+            _replace_projects(projects)
+            _prune_chat_state()
+        project_count = len(_PROJECTS)
+    if projects_changed or _log_path().exists():
+        _compact_log()
+    return project_count
 
 
 def _set_state(
@@ -142,12 +292,26 @@ def _set_state(
 ) -> None:
     _ROOTS.clear()
     _ROOTS.extend(sorted(roots))
-    _PROJECTS.clear()
-    _PROJECTS.update({info.path: info for info in projects})
+    _replace_projects(projects)
     _CHAT_STATE.clear()
     _CHAT_STATE.update(chat_state)
 
 
+def _replace_projects(projects: Iterable[ProjectInfo]) -> None:
+    global _PROJECTS_BY_LOWER_NAME
+    _PROJECTS.clear()
+    _PROJECTS.update({info.path: info for info in projects})
+    by_name: Dict[str, List[ProjectInfo]] = {}
+    for info in sorted(_PROJECTS.values(), key=lambda info: info.path):
+        by_name.setdefault(info.name.lower(), []).append(info)
+    # Swapped in whole so lock-free readers never see a partly built index.
+    _PROJECTS_BY_LOWER_NAME = by_name
+
+
+# resolve() stats every path component. Results are cached because roots and
+# projects are normalized repeatedly; rescan_projects() clears the cache so
+# filesystem changes (e.g. new symlinks) are picked up on the next rescan.
+@functools.lru_cache(maxsize=1024)
 def _normalize_path(raw_path: str) -> str:
     return str(Path(raw_path).expanduser().resolve())
 
@@ -157,24 +321,68 @@ def normalize_path(raw_path: str) -> str:
 
 
 def _scan_projects(roots: Iterable[str]) -> List[ProjectInfo]:
+    roots = list(roots)
+    if len(roots) > 1:
+        # scandir releases the GIL, so roots on separate disks scan in parallel.
+        with ThreadPoolExecutor(max_workers=min(MAX_SCAN_WORKERS, len(roots))) as executor:
+            per_root = list(executor.map(_scan_one_root, roots))
+    else:
+        per_root = [_scan_one_root(root) for root in roots]
     projects: Dict[str, ProjectInfo] = {}
-    for root in roots:
-        root_path = Path(root)
-        if not root_path.is_dir():
-            continue
-        for dirpath, dirnames, filenames in os.walk(root_path, followlinks=False):
-            has_git = ".git" in dirnames or ".git" in filenames
-            dirnames[:] = [name for name in dirnames if name not in IGNORED_DIR_NAMES]
-            if has_git:
-                project_path = str(Path(dirpath))
-                projects[project_path] = ProjectInfo(
-                    name=Path(dirpath).name,
-                    path=project_path,
-                )
-                dirnames[:] = []
+    for root_projects in per_root:
+        for info in root_projects:
+            projects[info.path] = info
     return list(projects.values())
 
 
+def _scan_one_root(root: str) -> List[ProjectInfo]:
+    if not Path(root).is_dir():
+        return []
+    # Paths are interned once here so the same string object (with its cached
+    # hash) is shared by _PROJECTS and every chat's threads_by_project.
+    return [
+        ProjectInfo(name=os.path.basename(project_path), path=sys.intern(project_path))
+        for project_path in _find_git_projects(root)
+    ]
+
+
+def _find_git_projects(root: str) -> List[str]:
+    """Breadth-first search for directories containing ``.git``.
+
+    Descent stops at a project directory and at ignored names. Directory
+    entries come from ``os.scandir``, whose cached dirent type answers
+    ``is_dir`` without a per-entry ``stat`` on Linux and macOS.
+    """
+    project_paths: List[str] = []
+    pending_dirs = deque([root])
+    while pending_dirs:
+        directory = pending_dirs.popleft()
+        try:
+            has_git, subdirectories = _scan_directory(directory)
+        except OSError:
+            # Unreadable directories are skipped, as os.walk did.
+            continue
+        if has_git:
+            project_paths.append(directory)
+            continue
+        pending_dirs.extend(subdirectories)
+    return project_paths
+
+
+def _scan_directory(directory: str) -> Tuple[bool, List[str]]:
+    subdirectories: List[str] = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            # A .git file (worktree or submodule) marks a project as well.
+            if entry.name == ".git":
+                return True, []
+            if entry.name in IGNORED_DIR_NAMES:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                subdirectories.append(entry.path)
+    return False, subdirectories
+
+
 def _prune_chat_state() -> None:
     known_projects = set(_PROJECTS.keys())
     for chat_state in _CHAT_STATE.values():
@@ -193,12 +401,16 @@ def _data_path() -> Path:
     return repo_root / "data" / "projects.json"
 
 
-def _load_from_disk() -> Tuple[List[str], List[ProjectInfo], Dict[int, ChatProjectState]]:
+def _log_path() -> Path:
+    return _data_path().with_suffix(".log")
+
+
+def _load_from_disk() -> Tuple[List[str], List[ProjectInfo], Dict[int, ChatProjectState], int]:
     data_path = _data_path()
     if not data_path.exists():
-        return [], [], {}
+        return [], [], {}, 0
     try:
-        data = json.loads(data_path.read_text(encoding="utf-8"))
+        data = _loads(data_path.read_bytes())
     except (OSError, json.JSONDecodeError) as exc:
         raise RuntimeError(f"Failed to read {data_path}: {exc}") from exc
 
@@ -222,7 +434,7 @@ def _load_from_disk() -> Tuple[List[str], List[ProjectInfo], Dict[int, ChatProje
             name = info.get("name")
             path = info.get("path") or project_path
             if isinstance(name, str) and isinstance(path, str):
-                projects.append(ProjectInfo(name=name, path=path))
+                projects.append(ProjectInfo(name=name, path=sys.intern(path)))
 
     chat_state_raw = data.get("chat_state", {})
     chat_state: Dict[int, ChatProjectState] = {}
@@ -235,7 +447,9 @@ def _load_from_disk() -> Tuple[List[str], List[ProjectInfo], Dict[int, ChatProje
             except (TypeError, ValueError):
                 continue
             current_project = entry.get("current_project")
-            if not isinstance(current_project, str):
+            if isinstance(current_project, str):
+                current_project = sys.intern(current_project)
+            else:
                 current_project = None
             default_thread_id = entry.get("default_thread_id")
             if not isinstance(default_thread_id, str):
@@ -245,21 +459,152 @@ def _load_from_disk() -> Tuple[List[str], List[ProjectInfo], Dict[int, ChatProje
             if isinstance(threads_raw, dict):
                 for project, thread_id in threads_raw.items():
                     if isinstance(project, str) and isinstance(thread_id, str):
-                        threads_by_project[project] = thread_id
+                        threads_by_project[sys.intern(project)] = thread_id
             chat_state[chat_id] = ChatProjectState(
                 current_project=current_project,
                 threads_by_project=threads_by_project,
                 default_thread_id=default_thread_id,
             )
 
-    return roots, projects, chat_state
+    log_seq = data.get("log_seq", 0)
+    if not isinstance(log_seq, int):
+        log_seq = 0
+
+    return roots, projects, chat_state, log_seq
+
 
+def _replay_log(chat_state: Dict[int, ChatProjectState], log_seq: int) -> int:
+    """Apply log records newer than ``log_seq``; return the last applied sequence."""
+    log_path = _log_path()
+    try:
+        raw = log_path.read_bytes()
+    except FileNotFoundError:
+        return log_seq
+    except OSError as exc:
+        raise RuntimeError(f"Failed to read {log_path}: {exc}") from exc
+
+    records: List[Dict[str, Any]] = []
+    for line in raw.splitlines():
+        try:
+            record = _loads(line)
+        except json.JSONDecodeError:
+            # A torn final line from a crash mid-append.
+            continue
+        if isinstance(record, dict) and isinstance(record.get("seq"), int):
+            records.append(record)
+    # Appends from different threads may reach the file out of sequence order.
+    records.sort(key=lambda record: record["seq"])
+
+    for record in records:
+        seq = record["seq"]
+        if seq <= log_seq:
+            continue
+        log_seq = seq
+        if record.get("op") != "thread":
+            continue
+        chat_id = record.get("chat")
+        thread_id = record.get("id")
+        project_path = record.get("project")
+        if not isinstance(chat_id, int) or not isinstance(thread_id, str):
+            continue
+        if isinstance(project_path, str):
+            project_path = sys.intern(project_path)
+        else:
+            project_path = None
+        _apply_thread_id(chat_state, chat_id, thread_id, project_path)
+    return log_seq
+
+
+def _append_log_record(record: Dict[str, object]) -> None:
+    global _LOG_FILE
+    with _LOG_LOCK:
+        if _LOG_FILE is None:
+            log_path = _log_path()
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            _LOG_FILE = open(log_path, "ab")
+        _LOG_FILE.write(_dumps_line(record))
+        _LOG_FILE.flush()
+        os.fsync(_LOG_FILE.fileno())
+
+
+def _compact_log() -> None:
+    """Write a snapshot that includes every log record, then drop the log."""
+    global _LOG_FILE
+    with _WRITE_LOCK:
+        # _STATE_LOCK is held until the log is gone so no newer sequence number
+        # can be assigned in between. Records still in flight carry numbers the
+        # snapshot already covers, so replay skips them if they land in a new
+        # log file.
+        with _STATE_LOCK:
+            _write_data(_snapshot_data())
+            with _LOG_LOCK:
+                if _LOG_FILE is not None:
+                    _LOG_FILE.close()
+                    _LOG_FILE = None
+                _log_path().unlink(missing_ok=True)
+
+
+def _request_save() -> None:
+    if _SAVE_LOOP is None:
+        # No background writer (e.g. before the bot's event loop is running).
+        _write_snapshot()
+        return
+    # Thread-safe: mutators may run in worker threads as well as on the loop.
+    _SAVE_LOOP.call_soon_threadsafe(_SAVE_REQUESTED.set)
 
-def _save_to_disk() -> None:
+
+async def _run_background_saves(save_requested: asyncio.Event) -> None:
+    while True:
+        await save_requested.wait()
+        await asyncio.sleep(SAVE_DEBOUNCE_SECONDS)
+        # Cleared before writing so a mutation during the write schedules
+        # another save instead of being lost.
+        save_requested.clear()
+        try:
+            await asyncio.to_thread(_write_snapshot)
+        except OSError:
+            logger.exception("Failed to save project data; will retry on next change.")
+
+
+def _write_snapshot() -> None:
+    with _WRITE_LOCK:
+        with _STATE_LOCK:
+            data = _snapshot_data()
+        _write_data(data)
+
+
+def _write_data(data: Dict[str, object]) -> None:
     data_path = _data_path()
     data_path.parent.mkdir(parents=True, exist_ok=True)
-    data = {
+    temp_path = data_path.with_suffix(".tmp")
+    temp_path.write_bytes(_dumps(data))
+    temp_path.replace(data_path)
+
+
+def _dumps(data: Dict[str, object]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+    return json.dumps(data, indent=2, sort_keys=True).encode("utf-8")
+
+
+def _dumps_line(record: Dict[str, object]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _loads(raw: bytes) -> Any:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can
+    # catch the stdlib type either way.
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _snapshot_data() -> Dict[str, object]:
+    return {
         "version": DATA_VERSION,
+        "log_seq": _LOG_SEQ,
         "roots": list(_ROOTS),
         "projects": {
             project.path: {"name": project.name, "path": project.path}
@@ -274,6 +619,3 @@ def _save_to_disk() -> None:
             for chat_id, chat_state in _CHAT_STATE.items()
         },
     }
-    temp_path = data_path.with_suffix(".tmp")
-    temp_path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
-    temp_path.replace(data_path)
@@ -1,10 +1,19 @@
 from __future__ import annotations
 
 import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional
 
+from codex_client.session import CodexSession
+
 _ALLOWED_USER_ID: Optional[int] = None
-_CHAT_LOCKS: Dict[int, asyncio.Lock] = {}
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+# Locks are dropped once no handler references them, so idle chats cost nothing.
+# A handler keeps its lock alive for as long as it holds or checks it.
+_CHAT_LOCKS: weakref.WeakValueDictionary[int, asyncio.Lock] = weakref.WeakValueDictionary()
+_CODEX_SESSIONS: Dict[int, CodexSession] = {}
+_CODEX_EXECUTORS: Dict[int, ThreadPoolExecutor] = {}
 
 
 def set_allowed_user_id(user_id: int) -> None:
@@ -16,9 +25,49 @@ def get_allowed_user_id() -> Optional[int]:
     return _ALLOWED_USER_ID
 
 
+def set_loop(loop: asyncio.AbstractEventLoop) -> None:
+    global _LOOP
+    _LOOP = loop
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return the bot's event loop, captured once in the application's post_init."""
+    if _LOOP is None:
+        raise RuntimeError("Event loop not set; state.set_loop() runs in post_init.")
+    return _LOOP
+
+
 def get_chat_lock(chat_id: int) -> asyncio.Lock:
     lock = _CHAT_LOCKS.get(chat_id)
     if lock is None:
         lock = asyncio.Lock()
         _CHAT_LOCKS[chat_id] = lock
     return lock
+
+
+def get_codex_session(chat_id: int) -> CodexSession:
+    # Callers hold the chat lock, so a chat never runs two turns on one session.
+    session = _CODEX_SESSIONS.get(chat_id)
+    if session is None:
+        session = CodexSession()
+        _CODEX_SESSIONS[chat_id] = session
+    return session
+
+
+def get_codex_executor(chat_id: int) -> ThreadPoolExecutor:
+    # One long-lived worker per chat: turns for a chat are serialized by the
+    # chat lock anyway, and the session is always driven from the same thread.
+    executor = _CODEX_EXECUTORS.get(chat_id)
+    if executor is None:
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"codex-{chat_id}")
+        _CODEX_EXECUTORS[chat_id] = executor
+    return executor
+
+
+def close_codex_sessions() -> None:
+    for session in _CODEX_SESSIONS.values():
+        session.close()
+    _CODEX_SESSIONS.clear()
+    for executor in _CODEX_EXECUTORS.values():
+        executor.shutdown(wait=False)
+    _CODEX_EXECUTORS.clear()
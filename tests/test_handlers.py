@@ -0,0 +1,161 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from telegram_bot import handlers, state
+
+EDIT_INTERVAL_SECONDS = 0.1
+
+
+class StubMessage:
+    def __init__(self):
+        self.edits = []
+
+    async def edit_text(self, text):
+        self.edits.append((time.monotonic(), text))
+
+
+class BlockingSession:
+    """Stands in for CodexSession; run_turn blocks until released."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def run_turn(self, instruction, thread_id, cwd, progress_callback):
+        self.started.set()
+        self.release.wait(timeout=5)
+        return "done", "thread-1", None
+
+    def close(self):
+        self.release.set()
+
+
+_EDITORS = []
+
+
+class RecordingEditor(handlers._StatusEditor):
+    def __init__(self, *args):
+        super().__init__(*args)
+        _EDITORS.append(self)
+
+
+@pytest.fixture(autouse=True)
+def short_edit_interval(monkeypatch):
+    monkeypatch.setattr(handlers, "STATUS_EDIT_INTERVAL_SECONDS", EDIT_INTERVAL_SECONDS)
+    monkeypatch.setattr(handlers, "_StatusEditor", RecordingEditor)
+    yield
+    _EDITORS.clear()
+
+
+def _run_with_single_worker_pool(scenario):
+    """Run ``scenario(loop)`` with a one-thread default executor.
+
+    The editor parks that thread in SimpleQueue.get(); if close() failed to
+    release it, _assert_pool_free would time out. Every editor is released
+    afterwards so a regression fails the test instead of hanging shutdown.
+    """
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=1))
+        try:
+            return await scenario(loop)
+        finally:
+            for editor in _EDITORS:
+                editor._pending.put(editor._CLOSED)
+
+    return asyncio.run(main())
+
+
+async def _assert_pool_free(loop):
+    result = await asyncio.wait_for(loop.run_in_executor(None, lambda: "free"), timeout=1.0)
+    assert result == "free"
+
+
+async def _wait_for_edits(message, count):
+    while len(message.edits) < count:
+        await asyncio.sleep(0.005)
+
+
+def test_status_editor_applies_latest_text_at_most_once_per_interval():
+    message = StubMessage()
+
+    async def scenario(loop):
+        editor = RecordingEditor(message, loop)
+
+        def produce_progress():
+            for step in range(50):
+                editor.submit_threadsafe(f"step {step}")
+                time.sleep(0.01)
+
+        producer = threading.Thread(target=produce_progress)
+        producer.start()
+        while producer.is_alive():
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(EDIT_INTERVAL_SECONDS * 2)
+        await editor.close()
+
+    _run_with_single_worker_pool(scenario)
+
+    times = [edited_at for edited_at, _ in message.edits]
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    assert all(gap >= EDIT_INTERVAL_SECONDS * 0.9 for gap in gaps)
+    assert 1 < len(message.edits) < 50
+    assert message.edits[-1][1] == "step 49"
+
+
+def test_status_editor_close_when_idle_releases_pool_thread():
+    message = StubMessage()
+
+    async def scenario(loop):
+        editor = RecordingEditor(message, loop)
+        await asyncio.sleep(0.05)
+        await editor.close()
+        await _assert_pool_free(loop)
+
+    _run_with_single_worker_pool(scenario)
+    assert message.edits == []
+
+
+def test_status_editor_close_mid_sleep_releases_pool_thread():
+    message = StubMessage()
+
+    async def scenario(loop):
+        editor = RecordingEditor(message, loop)
+        editor.submit_threadsafe("working")
+        await _wait_for_edits(message, 1)
+        # The editor is now sleeping out the edit interval.
+        await editor.close()
+        editor.submit_threadsafe("too late")
+        await _assert_pool_free(loop)
+
+    _run_with_single_worker_pool(scenario)
+    assert [text for _, text in message.edits] == ["working"]
+
+
+def test_cancelled_turn_releases_pool_thread(monkeypatch):
+    codex_session = BlockingSession()
+    monkeypatch.setitem(state._CODEX_SESSIONS, 1, codex_session)
+    monkeypatch.setattr(state, "_LOOP", None)
+
+    async def scenario(loop):
+        state.set_loop(loop)
+        turn = asyncio.create_task(
+            handlers._run_codex_turn(1, "hello", None, None, StubMessage()),
+        )
+        while not codex_session.started.is_set():
+            await asyncio.sleep(0.005)
+        turn.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await turn
+        await _assert_pool_free(loop)
+
+    try:
+        _run_with_single_worker_pool(scenario)
+    finally:
+        codex_session.release.set()
+        state.close_codex_sessions()
@@ -0,0 +1,203 @@
+import asyncio
+import json
+
+import pytest
+
+from telegram_bot import project_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(project_store, "_data_path", lambda: tmp_path / "projects.json")
+    project_store.initialize()
+    yield project_store
+    project_store._compact_log()
+
+
+def _log_records(store):
+    lines = store._log_path().read_bytes().splitlines()
+    return [json.loads(line) for line in lines]
+
+
+def _write_log(store, records, trailing=b""):
+    lines = [json.dumps(record).encode("utf-8") + b"\n" for record in records]
+    store._log_path().write_bytes(b"".join(lines) + trailing)
+
+
+def _thread_record(seq, thread_id, chat_id=1, project=None):
+    return {"seq": seq, "op": "thread", "chat": chat_id, "project": project, "id": thread_id}
+
+
+def _make_project(tmp_path, name):
+    project_dir = tmp_path / "root" / name
+    (project_dir / ".git").mkdir(parents=True)
+    return str(project_dir)
+
+
+def test_set_thread_id_appends_log_record(store):
+    store.set_thread_id(1, "T1", "/repo")
+
+    assert _log_records(store) == [_thread_record(1, "T1", project="/repo")]
+    assert store.get_thread_id(1, "/repo") == "T1"
+
+
+def test_set_thread_id_skips_unchanged_id(store):
+    store.set_thread_id(1, "T1", None)
+    store.set_thread_id(1, "T1", None)
+    store.set_thread_id(1, "T2", None)
+
+    assert [record["id"] for record in _log_records(store)] == ["T1", "T2"]
+
+
+def test_initialize_replays_log_and_compacts(store, tmp_path):
+    project = _make_project(tmp_path, "app")
+    store.add_root(str(tmp_path / "root"))
+    store.set_thread_id(1, "T1", project)
+    store.set_thread_id(2, "T2", None)
+
+    store.initialize()
+
+    assert store.get_thread_id(1, project) == "T1"
+    assert store.get_thread_id(2, None) == "T2"
+    assert not store._log_path().exists()
+    snapshot = json.loads(store._data_path().read_text(encoding="utf-8"))
+    assert snapshot["log_seq"] == 2
+
+
+def test_replay_skips_records_covered_by_snapshot(store):
+    store.set_thread_id(1, "T1", None)
+    # A snapshot written after the record (e.g. by a reset) covers its seq.
+    store.reset_thread_id(1, None)
+
+    store.initialize()
+
+    assert store.get_thread_id(1, None) is None
+
+
+def test_replay_applies_records_in_sequence_order(store):
+    _write_log(store, [_thread_record(2, "newer"), _thread_record(1, "older")])
+
+    store.initialize()
+
+    assert store.get_thread_id(1, None) == "newer"
+    assert store._LOG_SEQ == 2
+
+
+def test_replay_ignores_torn_final_line(store):
+    _write_log(store, [_thread_record(1, "T1")], trailing=b'{"seq": 2, "op": "thr')
+
+    store.initialize()
+
+    assert store.get_thread_id(1, None) == "T1"
+    assert store._LOG_SEQ == 1
+
+
+def test_unchanged_rescan_still_compacts_log(store, tmp_path):
+    project = _make_project(tmp_path, "app")
+    store.add_root(str(tmp_path / "root"))
+    store.set_thread_id(1, "T1", project)
+
+    store.rescan_projects()
+
+    assert not store._log_path().exists()
+    snapshot = json.loads(store._data_path().read_text(encoding="utf-8"))
+    assert snapshot["chat_state"]["1"]["threads_by_project"] == {project: "T1"}
+
+
+def test_initialize_prunes_chat_state_for_unknown_projects(store, tmp_path):
+    project = _make_project(tmp_path, "app")
+    store.add_root(str(tmp_path / "root"))
+    store.set_current_project(1, project)
+    store.set_thread_id(1, "T1", project)
+    store.set_thread_id(1, "stale", "/gone")
+
+    store.initialize()
+
+    assert store.get_current_project(1) == project
+    assert store.get_thread_id(1, project) == "T1"
+    assert store.get_thread_id(1, "/gone") is None
+
+
+def test_is_project_live_does_not_cache_missing_directory(store, tmp_path):
+    project = tmp_path / "app"
+
+    assert not store.is_project_live(str(project))
+    project.mkdir()
+
+    assert store.is_project_live(str(project))
+
+
+def _saved_chat_state(store):
+    snapshot = json.loads(store._data_path().read_text(encoding="utf-8"))
+    return snapshot["chat_state"]
+
+
+@pytest.fixture
+def counted_writes(store, monkeypatch):
+    monkeypatch.setattr(store, "SAVE_DEBOUNCE_SECONDS", 0.05)
+    writes = []
+    write_snapshot = store._write_snapshot
+
+    def counting_write_snapshot():
+        writes.append(None)
+        write_snapshot()
+
+    monkeypatch.setattr(store, "_write_snapshot", counting_write_snapshot)
+    return writes
+
+
+def test_save_without_running_loop_writes_immediately(store, counted_writes):
+    store.set_current_project(1, None)
+
+    assert len(counted_writes) == 1
+    assert "1" in _saved_chat_state(store)
+
+
+def test_background_saves_collapse_mutations_into_one_write(store, counted_writes):
+    async def scenario():
+        await store.start_background_saves()
+        for chat_id in range(10):
+            store.set_current_project(chat_id, None)
+        await asyncio.sleep(store.SAVE_DEBOUNCE_SECONDS * 4)
+        writes_before_stop = len(counted_writes)
+        await store.stop_background_saves()
+        return writes_before_stop
+
+    assert asyncio.run(scenario()) == 1
+    assert len(counted_writes) == 1
+    assert len(_saved_chat_state(store)) == 10
+
+
+def test_mutation_during_write_schedules_another_save(store, counted_writes, monkeypatch):
+    write_snapshot = store._write_snapshot
+
+    def mutate_during_first_write():
+        if not counted_writes:
+            # Runs on the writer thread, after the pending flag was cleared.
+            store.set_current_project(2, None)
+        write_snapshot()
+
+    monkeypatch.setattr(store, "_write_snapshot", mutate_during_first_write)
+
+    async def scenario():
+        await store.start_background_saves()
+        store.set_current_project(1, None)
+        await asyncio.sleep(store.SAVE_DEBOUNCE_SECONDS * 6)
+        await store.stop_background_saves()
+
+    asyncio.run(scenario())
+
+    assert len(counted_writes) == 2
+    assert set(_saved_chat_state(store)) == {"1", "2"}
+
+
+def test_stop_background_saves_flushes_pending_save(store, counted_writes):
+    async def scenario():
+        await store.start_background_saves()
+        store.set_current_project(1, None)
+        await store.stop_background_saves()
+
+    asyncio.run(scenario())
+
+    assert len(counted_writes) == 1
+    assert "1" in _saved_chat_state(store)
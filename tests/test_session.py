@@ -0,0 +1,223 @@
+import json
+import sys
+
+import pytest
+
+from codex_client import session
+
+
+def _delta_line(params):
+    message = {"method": "item/agentMessage/delta", "params": params}
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _decoded_delta(line):
+    return session._extract_agent_delta(json.loads(line))
+
+
+@pytest.mark.parametrize(
+    "delta",
+    [
+        "plain text",
+        'quote " and backslash \\ and newline \n',
+        "ends with backslash \\",
+        "café ☃ \U0001f600",
+    ],
+)
+def test_peek_agent_delta_matches_full_decode(delta):
+    line = _delta_line({"itemId": "item-1", "delta": delta})
+
+    assert session._peek_agent_delta(line) == delta.encode("utf-8")
+
+
+def test_peek_agent_delta_unescapes_ascii_escaped_non_ascii():
+    line = b'{"method":"item/agentMessage/delta","params":{"delta":"caf\\u00e9"}}'
+
+    assert session._peek_agent_delta(line) == "café".encode("utf-8")
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        # Empty delta: the full decode applies the "text" fallback.
+        {"delta": "", "text": "from text"},
+        # No delta key at all.
+        {"text": "from text"},
+        # A nested "delta" key before (or instead of) params.delta.
+        {"meta": {"delta": "nested"}, "delta": "real"},
+        {"meta": {"delta": "nested"}, "text": "real"},
+        {"items": ["x"], "delta": "real"},
+    ],
+)
+def test_peek_agent_delta_defers_to_full_decode(params):
+    line = _delta_line(params)
+
+    assert session._peek_agent_delta(line) is None
+    assert _decoded_delta(line) == (params.get("delta") or params.get("text"))
+
+
+def test_peek_agent_delta_ignores_delta_outside_params():
+    line = b'{"method":"item/agentMessage/delta","params":{"text":"real"},"delta":"x"}'
+
+    assert session._peek_agent_delta(line) is None
+
+
+def test_peek_agent_delta_ignores_other_methods():
+    line = b'{"method":"item/started","params":{"delta":"x"}}'
+
+    assert session._peek_agent_delta(line) is None
+
+
+FAKE_APP_SERVER = '''
+import json
+import os
+import sys
+
+mode = os.environ.get("FAKE_CODEX_MODE", "")
+
+
+def send(message):
+    sys.stdout.write(json.dumps(message) + "\\n")
+    sys.stdout.flush()
+
+
+with open(os.environ["FAKE_CODEX_RECORD"], "a") as record:
+    for raw in sys.stdin:
+        message = json.loads(raw)
+        record.write(json.dumps({"pid": os.getpid(), "message": message}) + "\\n")
+        record.flush()
+        method = message.get("method")
+        if method == "initialize":
+            send({"id": message["id"], "result": {}})
+        elif method in ("thread/start", "thread/resume"):
+            if mode == "thread-error":
+                send({"id": message["id"], "error": {"message": "no threads today"}})
+                continue
+            thread_id = message["params"].get("threadId", "thread-1")
+            send({"id": message["id"], "result": {"thread": {"id": thread_id}}})
+        elif method == "turn/start":
+            send({"id": message["id"], "result": {}})
+            text = message["params"]["input"][0]["text"]
+            send({"method": "item/agentMessage/delta", "params": {"delta": "echo: "}})
+            if mode == "eof-mid-turn":
+                sys.exit(0)
+            send({"method": "item/agentMessage/delta", "params": {"delta": text}})
+            send({"method": "turn/completed", "params": {}})
+'''
+
+
+@pytest.fixture
+def fake_codex(tmp_path, monkeypatch):
+    script = tmp_path / "fake-codex"
+    script.write_text(f"#!{sys.executable}\n{FAKE_APP_SERVER}", encoding="utf-8")
+    script.chmod(0o755)
+    record_path = tmp_path / "received.jsonl"
+    monkeypatch.setenv("CODEX_COMMAND", str(script))
+    monkeypatch.setenv("FAKE_CODEX_RECORD", str(record_path))
+    monkeypatch.setattr(session, "_LOGS_DIR", tmp_path / "logs")
+    monkeypatch.setattr(session, "_LOGS_DIR_READY", False)
+
+    def received():
+        if not record_path.exists():
+            return []
+        lines = record_path.read_text(encoding="utf-8").splitlines()
+        return [json.loads(line) for line in lines]
+
+    return received
+
+
+def _requests(received):
+    """(pid, method, id) for every request the fake server received."""
+    return [
+        (entry["pid"], entry["message"]["method"], entry["message"].get("id"))
+        for entry in received()
+        if entry["message"]["method"] != "initialized"
+    ]
+
+
+def test_session_reuses_process_and_loaded_thread(fake_codex):
+    with session.CodexSession() as codex:
+        results = [codex.run_turn(f"turn {n}", "thread-1" if n else None) for n in range(3)]
+
+    assert [(text, thread_id) for text, thread_id, _ in results] == [
+        ("echo: turn 0", "thread-1"),
+        ("echo: turn 1", "thread-1"),
+        ("echo: turn 2", "thread-1"),
+    ]
+    requests = _requests(fake_codex)
+    assert len({pid for pid, _, _ in requests}) == 1
+    assert [(method, request_id) for _, method, request_id in requests] == [
+        ("initialize", 0),
+        ("thread/start", 1),
+        ("turn/start", 2),
+        ("turn/start", 3),
+        ("turn/start", 4),
+    ]
+
+
+def test_thread_start_error_closes_session(fake_codex, monkeypatch):
+    codex = session.CodexSession()
+    monkeypatch.setenv("FAKE_CODEX_MODE", "thread-error")
+    with pytest.raises(RuntimeError, match="no threads today"):
+        codex.run_turn("hello")
+    assert not codex._is_running()
+
+    monkeypatch.delenv("FAKE_CODEX_MODE")
+    text, thread_id, _ = codex.run_turn("again")
+    codex.close()
+
+    assert (text, thread_id) == ("echo: again", "thread-1")
+    pids = [pid for pid, _, _ in _requests(fake_codex)]
+    assert pids[0] != pids[-1]
+
+
+def test_eof_mid_turn_returns_partial_text_and_respawns(fake_codex, monkeypatch):
+    codex = session.CodexSession()
+    monkeypatch.setenv("FAKE_CODEX_MODE", "eof-mid-turn")
+    text, thread_id, _ = codex.run_turn("hello")
+    assert (text, thread_id) == ("echo: ", "thread-1")
+    assert not codex._is_running()
+
+    monkeypatch.delenv("FAKE_CODEX_MODE")
+    text, _, _ = codex.run_turn("again", thread_id)
+    codex.close()
+
+    assert text == "echo: again"
+    # The new process has not loaded the thread, so it is resumed, and request
+    # ids start over on the new connection.
+    second_process = _requests(fake_codex)[3:]
+    assert [(method, request_id) for _, method, request_id in second_process] == [
+        ("initialize", 0),
+        ("thread/resume", 1),
+        ("turn/start", 2),
+    ]
+
+
+def test_close_then_run_turn_respawns(fake_codex):
+    codex = session.CodexSession()
+    _, thread_id, _ = codex.run_turn("first")
+    codex.close()
+    assert not codex._is_running()
+
+    text, _, _ = codex.run_turn("second", thread_id)
+    codex.close()
+
+    assert text == "echo: second"
+    requests = _requests(fake_codex)
+    assert requests[0][0] != requests[-1][0]
+    assert [(method, request_id) for _, method, request_id in requests[3:]] == [
+        ("initialize", 0),
+        ("thread/resume", 1),
+        ("turn/start", 2),
+    ]
+
+
+def test_close_reaps_process_and_closes_pipes(fake_codex):
+    codex = session.CodexSession()
+    codex.run_turn("hello")
+    proc = codex._proc
+
+    codex.close()
+
+    assert proc.returncode is not None
+    assert proc.stdin.closed and proc.stdout.closed and proc.stderr.closed